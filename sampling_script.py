@@ -1,9 +1,202 @@
+import bisect
+import functools
+import logging
+import itertools
+import math
+import os
 import random
+import numpy as np
 import pandas as pd
 from typing import List, Union
 import sys
 import argparse
 
+logger = logging.getLogger(__name__)
+
+_EXHAUSTED = object()
+
+# Sample-size tiers: (portfolio upper bound, conservative, moderate, aggressive, note)
+_TIERS = (
+    (10, 10, 10, 10, "Document all projects for small portfolios"),
+    (25, 15, 12, 8, "Small portfolio - document majority of projects"),
+    (50, 25, 18, 12, "Medium portfolio - 25-50% documentation typical"),
+    (100, 35, 25, 15, "Large portfolio - 15-35% documentation common"),
+    (200, 50, 35, 20, "Very large portfolio - 10-25% documentation"),
+    (float("inf"), 75, 50, 30, "Enterprise portfolio - 5-15% documentation may suffice"),
+)
+_THRESHOLDS = [tier[0] for tier in _TIERS]
+
+_GENERAL_NOTES = (
+    "Conservative: Lower audit risk, higher documentation cost",
+    "Moderate: Balanced approach, most common selection",
+    "Aggressive: Higher audit risk, lower documentation cost",
+    "Consider project size, complexity, and credit value when selecting",
+)
+
+def _iter_excel_column(file_path, project_column=None):
+    """
+    Stream one worksheet column as cleaned strings using openpyxl's
+    read-only mode, which parses cells via SAX instead of building the
+    full OOXML DOM in memory.
+    """
+    from openpyxl import load_workbook
+
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        header = next(ws.iter_rows(min_row=1, max_row=1, values_only=True), ())
+        if project_column:
+            try:
+                col = header.index(project_column) + 1
+            except ValueError:
+                raise ValueError(f"Column '{project_column}' not found in Excel file") from None
+        else:
+            col = 1
+        for (value,) in ws.iter_rows(min_row=2, min_col=col, max_col=col, values_only=True):
+            if value is None:
+                continue
+            value = str(value).strip()
+            if value:
+                yield value
+    finally:
+        wb.close()
+
+def _reservoir_sample_stream(iterator, k, rng):
+    """
+    Draw a uniform k-sample from an iterator of unknown length in one pass
+    using Li's Algorithm L, which skips ahead by geometrically distributed
+    gaps so only ~k*log(n/k) random numbers are drawn instead of n.
+
+    Returns:
+        Tuple of (sample list, total number of items seen)
+    """
+    if k <= 0:
+        return [], 0
+
+    it = iter(iterator)
+    reservoir = list(itertools.islice(it, k))
+    n = len(reservoir)
+    if n < k:
+        return reservoir, n
+
+    # Hoist bound methods out of the loop; attribute lookups add up here
+    _rand = rng.random
+    _randrange = rng.randrange
+    _log, _exp, _floor = math.log, math.exp, math.floor
+
+    w = _exp(_log(_rand()) / k)
+    while True:
+        # Skip the rows that keep their place; the next one is replaced
+        skip = _floor(_log(_rand()) / _log(1.0 - w))
+        for _ in range(skip):
+            if next(it, _EXHAUSTED) is _EXHAUSTED:
+                return reservoir, n
+            n += 1
+        item = next(it, _EXHAUSTED)
+        if item is _EXHAUSTED:
+            return reservoir, n
+        n += 1
+        reservoir[_randrange(k)] = item
+        w *= _exp(_log(_rand()) / k)
+
+def _partial_shuffle(pop, k, rng):
+    """
+    Yield a uniform k-sample by running only the first k swaps of a
+    Fisher-Yates shuffle over pop (which is mutated in place): O(k) work
+    instead of shuffling all n elements.
+    """
+    randrange = rng.randrange
+    n = len(pop)
+    for i in range(k):
+        j = randrange(i, n)
+        pop[i], pop[j] = pop[j], pop[i]
+        yield pop[i]
+
+@functools.lru_cache(maxsize=8)
+def _parse_column(xl, project_column=None):
+    """
+    Extract the cleaned project column from an open ExcelFile. Cached per
+    workbook handle; _ensure_workbook replaces the handle whenever the
+    file changes on disk, so stale entries simply stop being hit.
+    """
+    df = xl.parse(
+        sheet_name=0,
+        usecols=[project_column] if project_column else [0],
+        dtype="string",
+    )
+    # Only one column was read, so collapse the frame to a Series and
+    # strip/filter in pandas' vectorized string kernels rather than
+    # one Python call per cell
+    s = df.squeeze("columns").dropna().astype("string").str.strip()
+    return tuple(s[s.str.len() > 0].tolist())
+
+@functools.lru_cache(maxsize=8)
+def _stream_cached(file_path, mtime, project_column):
+    """
+    Memoized openpyxl streaming load. mtime is part of the key so editing
+    the workbook on disk invalidates the entry; the tuple return keeps
+    cached values hashable and safe to share between callers.
+    """
+    return tuple(_iter_excel_column(file_path, project_column))
+
+def _recommend(total_projects):
+    """Build the recommendation dict for a portfolio of total_projects."""
+    # Single binary search into the tier table instead of an if/elif ladder
+    tier = _TIERS[bisect.bisect_left(_THRESHOLDS, total_projects)]
+    _, conservative, moderate, aggressive, note = tier
+
+    return {
+        'total_projects': total_projects,
+        'conservative': min(total_projects, conservative),
+        'moderate': min(total_projects, moderate),
+        'aggressive': min(total_projects, aggressive),
+        'notes': [note, *_GENERAL_NOTES]
+    }
+
+class _LazyRecommendations:
+    """
+    Mapping that defers building the recommendation dict until a key is
+    first read, so runs with an explicit num_to_select that never look at
+    the recommendations skip the computation entirely.
+    """
+    __slots__ = ('_total_projects', '_data')
+
+    def __init__(self, total_projects):
+        self._total_projects = total_projects
+        self._data = None
+
+    def _materialize(self):
+        if self._data is None:
+            self._data = _recommend(self._total_projects)
+        return self._data
+
+    def __getitem__(self, key):
+        return self._materialize()[key]
+
+    def __contains__(self, key):
+        return key in self._materialize()
+
+    def get(self, key, default=None):
+        return self._materialize().get(key, default)
+
+    def keys(self):
+        return self._materialize().keys()
+
+    def items(self):
+        return self._materialize().items()
+
+    def values(self):
+        return self._materialize().values()
+
+    def __iter__(self):
+        return iter(self._materialize())
+
+    def __len__(self):
+        return len(self._materialize())
+
+    def __repr__(self):
+        return repr(self._materialize())
+
 class RDProjectRandomizer:
     """
     A tool to randomly select R&D projects for tax credit documentation.
@@ -12,60 +205,127 @@ class RDProjectRandomizer:
     
     def __init__(self, seed=None):
         """Initialize with optional random seed for reproducible results."""
-        if seed:
-            random.seed(seed)
+        # Dedicated Random instance: seed=0 is honored, and concurrent
+        # randomizers don't contend on the module-global RNG state.
+        # Unseeded runs draw from the OS entropy pool so selections are
+        # unpredictable; seeded runs stay reproducible.
+        self._rng = random.Random(seed) if seed is not None else random.SystemRandom()
+        self._seed = seed
+        self._np_rng = None
+        self._xl = None
+        self._xl_key = None
+
+    def _ensure_workbook(self, file_path, mtime):
+        """
+        Open file_path as a pd.ExcelFile, reusing the previous handle when
+        the path and mtime are unchanged so repeated column/sheet queries
+        share the parse work.
+        """
+        if self._xl is None or self._xl_key != (file_path, mtime):
+            self.close()
+            # calamine (Rust-based) parses large sheets several times faster
+            # than openpyxl and uses far less memory
+            self._xl = pd.ExcelFile(file_path, engine="calamine")
+            self._xl_key = (file_path, mtime)
+        return self._xl
+
+    def close(self):
+        """Release the cached workbook handle, if any."""
+        if self._xl is not None:
+            self._xl.close()
+            self._xl = None
+            self._xl_key = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
     
-    def load_projects_from_excel(self, file_path: str, project_column: str = None) -> List[str]:
+    def load_projects_from_excel(self, file_path: str, project_column: str = None,
+                                 sample_size: int = None) -> List[str]:
         """
         Load projects from an Excel file.
-        
+
         Args:
             file_path: Path to Excel file
             project_column: Name of column containing project names (if None, uses first column)
-        
+            sample_size: If given, reservoir-sample this many projects while
+                reading so the full list is never held in memory
+
         Returns:
-            List of project names
+            List of project names (a uniform sample when sample_size is given)
         """
         try:
-            df = pd.read_excel(file_path)
-            
-            if project_column:
-                if project_column not in df.columns:
-                    raise ValueError(f"Column '{project_column}' not found in Excel file")
-                projects = df[project_column].dropna().tolist()
-            else:
-                # Use first column if no column specified
-                projects = df.iloc[:, 0].dropna().tolist()
-            
-            # Convert to strings and remove empty entries
-            projects = [str(project).strip() for project in projects if str(project).strip()]
-            
-            print(f"Loaded {len(projects)} projects from Excel file")
+            if sample_size is not None:
+                try:
+                    sampled, total = _reservoir_sample_stream(
+                        _iter_excel_column(file_path, project_column), sample_size, self._rng)
+                except ImportError:
+                    # openpyxl unavailable; sample the calamine-loaded list instead
+                    projects = self.load_projects_from_excel(file_path, project_column)
+                    sampled, total = _reservoir_sample_stream(projects, sample_size, self._rng)
+                logger.info("Sampled %d of %d projects from Excel file", len(sampled), total)
+                return sampled
+
+            mtime = os.path.getmtime(file_path)
+            try:
+                # Reuse the parsed workbook across calls on the same file
+                xl = self._ensure_workbook(file_path, mtime)
+                projects = list(_parse_column(xl, project_column))
+            except ImportError:
+                # python-calamine not installed - stream the column through
+                # openpyxl's read-only mode instead of paying the full DOM cost
+                projects = list(_stream_cached(file_path, mtime, project_column))
+
+            logger.info("Loaded %d projects from Excel file", len(projects))
             return projects
             
         except Exception as e:
-            print(f"Error loading Excel file: {e}")
+            logger.error("Error loading Excel file: %s", e)
             return []
     
-    def select_random_projects(self, projects: List[str], num_to_select: int) -> List[str]:
+    def select_random_projects(self, projects: List[str], num_to_select: int,
+                               n: int = None) -> List[str]:
         """
         Randomly select projects from the list.
-        
+
         Args:
             projects: List of all projects
             num_to_select: Number of projects to select
-        
+            n: Population size, if the caller already knows it
+
         Returns:
             List of randomly selected projects
         """
-        if num_to_select > len(projects):
-            print(f"Warning: Requested {num_to_select} projects but only {len(projects)} available")
-            num_to_select = len(projects)
-        
+        if n is None:
+            n = len(projects)
+
+        if num_to_select > n:
+            logger.warning("Requested %d projects but only %d available", num_to_select, n)
+            num_to_select = n
+
         if num_to_select <= 0:
             return []
-        
-        selected = random.sample(projects, num_to_select)
+
+        if n > 50_000:
+            # Floyd's algorithm in C plus one vectorized gather beats
+            # random.sample's per-element hashing at this scale
+            if self._np_rng is None:
+                # Built on first use; the mask folds any int seed (including
+                # negatives, which default_rng rejects) into its accepted range
+                self._np_rng = np.random.default_rng(
+                    None if self._seed is None else self._seed & (2**64 - 1))
+            arr = np.asarray(projects, dtype=object)
+            idx = self._np_rng.choice(n, num_to_select, replace=False)
+            return arr[idx].tolist()
+
+        if num_to_select > n / 4:
+            # Dense selections: k Fisher-Yates swaps on a copy beat
+            # random.sample's rejection sampling
+            return list(_partial_shuffle(list(projects), num_to_select, self._rng))
+
+        selected = self._rng.sample(projects, num_to_select)
         return selected
     
     def get_recommended_sample_size(self, total_projects: int) -> dict:
@@ -78,59 +338,7 @@ class RDProjectRandomizer:
         Returns:
             Dictionary with recommendations
         """
-        recommendations = {
-            'total_projects': total_projects,
-            'conservative': 0,
-            'moderate': 0,
-            'aggressive': 0,
-            'notes': []
-        }
-        
-        if total_projects <= 10:
-            recommendations['conservative'] = total_projects
-            recommendations['moderate'] = total_projects
-            recommendations['aggressive'] = total_projects
-            recommendations['notes'].append("Document all projects for small portfolios")
-            
-        elif total_projects <= 25:
-            recommendations['conservative'] = min(total_projects, 15)
-            recommendations['moderate'] = min(total_projects, 12)
-            recommendations['aggressive'] = min(total_projects, 8)
-            recommendations['notes'].append("Small portfolio - document majority of projects")
-            
-        elif total_projects <= 50:
-            recommendations['conservative'] = min(total_projects, 25)
-            recommendations['moderate'] = min(total_projects, 18)
-            recommendations['aggressive'] = min(total_projects, 12)
-            recommendations['notes'].append("Medium portfolio - 25-50% documentation typical")
-            
-        elif total_projects <= 100:
-            recommendations['conservative'] = min(total_projects, 35)
-            recommendations['moderate'] = min(total_projects, 25)
-            recommendations['aggressive'] = min(total_projects, 15)
-            recommendations['notes'].append("Large portfolio - 15-35% documentation common")
-            
-        elif total_projects <= 200:
-            recommendations['conservative'] = min(total_projects, 50)
-            recommendations['moderate'] = min(total_projects, 35)
-            recommendations['aggressive'] = min(total_projects, 20)
-            recommendations['notes'].append("Very large portfolio - 10-25% documentation")
-            
-        else:  # > 200 projects
-            recommendations['conservative'] = min(total_projects, 75)
-            recommendations['moderate'] = min(total_projects, 50)
-            recommendations['aggressive'] = min(total_projects, 30)
-            recommendations['notes'].append("Enterprise portfolio - 5-15% documentation may suffice")
-        
-        # Add general notes
-        recommendations['notes'].extend([
-            "Conservative: Lower audit risk, higher documentation cost",
-            "Moderate: Balanced approach, most common selection",
-            "Aggressive: Higher audit risk, lower documentation cost",
-            "Consider project size, complexity, and credit value when selecting"
-        ])
-        
-        return recommendations
+        return _recommend(total_projects)
     
     def randomize_projects(self, input_data: Union[str, List[str]], 
                           num_to_select: int = None, 
@@ -152,31 +360,35 @@ class RDProjectRandomizer:
         if isinstance(input_data, str):
             projects = self.load_projects_from_excel(input_data, project_column)
         elif isinstance(input_data, list):
-            projects = [str(p).strip() for p in input_data if str(p).strip()]
-            print(f"Using provided list of {len(projects)} projects")
+            projects = [s for p in input_data if (s := str(p).strip())]
+            logger.info("Using provided list of %d projects", len(projects))
         else:
             raise ValueError("Input must be either file path (string) or list of projects")
         
         if not projects:
             return {'error': 'No projects found in input'}
-        
-        # Get recommendations
-        recommendations = self.get_recommended_sample_size(len(projects))
-        
+
+        # Population size is used several times below; compute it once
+        n = len(projects)
+
+        # Recommendations are computed lazily: nothing is built unless the
+        # caller (or the num_to_select default below) actually reads them
+        recommendations = _LazyRecommendations(n)
+
         # Determine number to select
         if num_to_select is None:
             num_to_select = recommendations[recommendation_level]
-            print(f"Using {recommendation_level} recommendation: {num_to_select} projects")
-        
+            logger.info("Using %s recommendation: %d projects", recommendation_level, num_to_select)
+
         # Select random projects
-        selected_projects = self.select_random_projects(projects, num_to_select)
-        
+        selected_projects = self.select_random_projects(projects, num_to_select, n=n)
+
         return {
-            'total_projects': len(projects),
+            'total_projects': n,
             'selected_count': len(selected_projects),
             'selected_projects': selected_projects,
             'recommendations': recommendations,
-            'selection_percentage': round((len(selected_projects) / len(projects)) * 100, 1)
+            'selection_percentage': round((len(selected_projects) / n) * 100, 1)
         }
 
 def main():
@@ -191,21 +403,28 @@ def main():
     parser.add_argument('--list', action='store_true', help='Use manual list input instead of Excel')
     
     args = parser.parse_args()
-    
+
+    # Library messages go through logging; the CLI surfaces them as-is
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if not sys.stdout.isatty():
+        # Block-buffer piped output instead of flushing on every newline
+        sys.stdout.reconfigure(line_buffering=False)
+
     randomizer = RDProjectRandomizer(seed=args.seed)
     
     try:
         if args.list:
-            print("Enter projects one per line (press Ctrl+C when done):")
+            print("Enter projects one per line (press Ctrl+D when done):")
             projects = []
             try:
-                while True:
-                    project = input().strip()
-                    if project:
-                        projects.append(project)
+                # Iterating sys.stdin uses buffered C-level reads instead of
+                # one Python-level input() call per line; EOF ends the loop
+                projects = [s for line in sys.stdin if (s := line.strip())]
             except KeyboardInterrupt:
-                print(f"\nProcessing {len(projects)} projects...")
-            
+                pass
+            print(f"\nProcessing {len(projects)} projects...")
+
             result = randomizer.randomize_projects(projects, args.number, 
                                                  recommendation_level=args.level)
         else:
@@ -215,30 +434,37 @@ def main():
         if 'error' in result:
             print(f"Error: {result['error']}")
             return
-        
-        # Display results
-        print(f"\n{'='*50}")
-        print(f"R&D PROJECT SELECTION RESULTS")
-        print(f"{'='*50}")
-        print(f"Total Projects: {result['total_projects']}")
-        print(f"Selected: {result['selected_count']} ({result['selection_percentage']}%)")
-        print(f"\nSelected Projects:")
-        print("-" * 30)
-        for i, project in enumerate(result['selected_projects'], 1):
-            print(f"{i:2d}. {project}")
-        
-        print(f"\n{'='*50}")
-        print("DOCUMENTATION RECOMMENDATIONS")
-        print(f"{'='*50}")
+
+        # Build the whole report and write it in one call instead of one
+        # lock-and-flush print per line
         recs = result['recommendations']
-        print(f"Conservative approach: {recs['conservative']} projects")
-        print(f"Moderate approach:     {recs['moderate']} projects")
-        print(f"Aggressive approach:   {recs['aggressive']} projects")
-        
-        print(f"\nNotes:")
-        for note in recs['notes']:
-            print(f"• {note}")
-            
+        lines = [
+            "",
+            "=" * 50,
+            "R&D PROJECT SELECTION RESULTS",
+            "=" * 50,
+            f"Total Projects: {result['total_projects']}",
+            f"Selected: {result['selected_count']} ({result['selection_percentage']}%)",
+            "",
+            "Selected Projects:",
+            "-" * 30,
+        ]
+        lines.extend(f"{i:2d}. {project}"
+                     for i, project in enumerate(result['selected_projects'], 1))
+        lines.extend([
+            "",
+            "=" * 50,
+            "DOCUMENTATION RECOMMENDATIONS",
+            "=" * 50,
+            f"Conservative approach: {recs['conservative']} projects",
+            f"Moderate approach:     {recs['moderate']} projects",
+            f"Aggressive approach:   {recs['aggressive']} projects",
+            "",
+            "Notes:",
+        ])
+        lines.extend(f"• {note}" for note in recs['notes'])
+        sys.stdout.write("\n".join(lines) + "\n")
+
     except Exception as e:
         print(f"Error: {e}")
 